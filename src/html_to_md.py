@@ -37,19 +37,31 @@ Dependencies:
     - logging: For error and info logging
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import html2text
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# LRU cache of converted Markdown, keyed by a digest of the source HTML
+MARKDOWN_CACHE_SIZE = 128
+_markdown_cache: "OrderedDict[str, str]" = OrderedDict()
+_markdown_cache_lock = threading.Lock()
+
+def _html_digest(html: str) -> str:
+    """Return a short content hash used as the Markdown cache key."""
+    return hashlib.blake2b(html.encode('utf-8', 'replace'), digest_size=16).hexdigest()
+
 def html_to_markdown(html: str) -> str:
     """Convert full HTML to clean Markdown.
     
     This function takes HTML content and converts it to a clean, readable Markdown format.
     It handles various HTML elements and provides configurable output options.
-    Large files are supported by streaming internally.
+    Large files are supported by streaming internally. Results are cached by
+    content hash, so converting the same page twice only pays for it once.
     
     Args:
         html (str): The HTML content to convert. Can be a full HTML document or a fragment.
@@ -72,6 +84,14 @@ def html_to_markdown(html: str) -> str:
         if not html:
             logger.warning("Empty HTML content provided")
             return ""
+        
+        # Return the cached conversion if we've seen this exact HTML before
+        key = _html_digest(html)
+        with _markdown_cache_lock:
+            cached = _markdown_cache.get(key)
+            if cached is not None:
+                _markdown_cache.move_to_end(key)
+                return cached
             
         # Configure the converter
         converter = html2text.HTML2Text()
@@ -89,9 +109,14 @@ def html_to_markdown(html: str) -> str:
         # Clean up the output
         markdown = markdown.strip()
         
-        logger.info(f"Successfully converted HTML to Markdown (length: {len(markdown)})")
+        with _markdown_cache_lock:
+            _markdown_cache[key] = markdown
+            if len(_markdown_cache) > MARKDOWN_CACHE_SIZE:
+                _markdown_cache.popitem(last=False)
+        
+        logger.info("Successfully converted HTML to Markdown (length: %d)", len(markdown))
         return markdown
         
     except Exception as e:
-        logger.error(f"Error converting HTML to Markdown: {str(e)}")
+        logger.error("Error converting HTML to Markdown: %s", e)
         return "" 
\ No newline at end of file
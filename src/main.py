@@ -15,6 +15,8 @@ from __future__ import annotations
 
 # Python standard library imports
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 import os
 import sys
@@ -27,10 +29,8 @@ if __name__ == '__main__':
 import click
 from dotenv import load_dotenv
 
-# Local application imports
-from src.html_to_md import html_to_markdown
-from src.tee_time_analyzer import fetch_and_extract_tee_times
-from src.web_processor import get_visible_rendered_html
+# Local application imports are deferred to the commands that need them so
+# that CLI startup (and --help) doesn't pay for importing Playwright/OpenAI
 
 # Load environment variables
 load_dotenv()
@@ -42,14 +42,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Maximum number of URLs analyzed concurrently, each with its own browser
+MAX_WORKERS = 4
+
 @click.group()
-def cli() -> None:
+@click.option('--verbose', '-v', is_flag=True, help='Show debug logging, including raw AI responses')
+def cli(verbose: bool) -> None:
     """Golf Buddy - Your AI-powered tee time finder.
     
     This CLI tool helps golfers find and analyze tee times using AI,
     and provides utilities for converting web content to markdown format.
     """
-    pass
+    if verbose:
+        # Only our own modules; third-party debug output is too noisy
+        logging.getLogger('src').setLevel(logging.DEBUG)
 
 @cli.command()
 @click.argument('urls', nargs=-1, required=True)
@@ -66,43 +72,94 @@ def analyze_tee_times(urls: List[str], follow: bool) -> None:
     2. Use AI to analyze the content
     3. Extract and display available tee times
     """
+    from src.tee_time_analyzer import display_results
+    
     for url in urls:
         click.echo(f"\nAnalyzing tee times from {url} using AI...")
-        try:
-            fetch_and_extract_tee_times(url, follow)
-        except Exception as e:
-            logger.error(f"Error analyzing {url}: {str(e)}")
-            click.echo(f"Failed to analyze {url}: {str(e)}", err=True)
+    
+    pending: queue.Queue = queue.Queue()
+    for url in urls:
+        pending.put(url)
+    results: queue.Queue = queue.Queue()
+    
+    # Workers pull URLs until none are left; each reuses one browser for all
+    # of its URLs and results are displayed as soon as they complete
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_WORKERS)) as executor:
+        for _ in range(min(len(urls), MAX_WORKERS)):
+            executor.submit(_analyze_worker, pending, results, follow)
+        for _ in urls:
+            url, analysis, error = results.get()
+            if error is not None:
+                logger.error("Error analyzing %s: %s", url, error)
+                click.echo(f"Failed to analyze {url}: {str(error)}", err=True)
+            elif analysis:
+                click.echo(f"\nResults for {url}:")
+                display_results(analysis)
+
+def _analyze_worker(pending: queue.Queue, results: queue.Queue, follow: bool) -> None:
+    """Analyze URLs from the pending queue on the current thread.
+    
+    Args:
+        pending: Queue of URLs still to be analyzed
+        results: Queue receiving (url, analysis, error) tuples
+        follow: Whether to automatically follow booking links
+    """
+    from src.tee_time_analyzer import fetch_and_extract_tee_times
+    from src.web_processor import close_processor
+    
+    try:
+        while True:
+            try:
+                url = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results.put((url, fetch_and_extract_tee_times(url, follow), None))
+            except Exception as e:
+                results.put((url, None, e))
+    finally:
+        # The browser belongs to this thread, so it must be closed here
+        close_processor()
 
 @cli.command()
 @click.argument('url')
 @click.option('--output', '-o', type=click.Path(), help='Output file path for the markdown content')
-def convert_to_markdown(url: str, output: Optional[str]) -> None:
+@click.option('--ready-selector', help='CSS selector to wait for before reading the page')
+def convert_to_markdown(url: str, output: Optional[str], ready_selector: Optional[str]) -> None:
     """Convert a webpage to clean markdown format.
     
     Args:
         url: The URL of the webpage to convert
         output: Optional path to save the markdown content
+        ready_selector: Optional CSS selector to wait for before reading the page
         
     This command will:
     1. Fetch the webpage content
     2. Convert HTML to clean markdown
     3. Either save to file or print to console
     """
+    from src.web_processor import get_visible_rendered_html, close_processor
+    
     try:
-        logger.info(f"Fetching content from: {url}")
-        markdown_content = get_visible_rendered_html(url)
+        logger.info("Fetching content from: %s", url)
+        markdown_content = get_visible_rendered_html(url, ready_selector=ready_selector)
+        if not markdown_content:
+            raise click.ClickException(f"Error processing URL: {url}")
         
         if output:
             with open(output, 'w', encoding='utf-8') as f:
                 f.write(markdown_content)
-            logger.info(f"Markdown content saved to: {output}")
+            logger.info("Markdown content saved to: %s", output)
         else:
             click.echo(markdown_content)
             
+    except click.ClickException:
+        raise
     except Exception as e:
-        logger.error(f"Error converting webpage to markdown: {str(e)}")
+        logger.error("Error converting webpage to markdown: %s", e)
         raise click.ClickException(str(e))
+    finally:
+        close_processor()
 
 def main() -> None:
     """Main entry point for the CLI application."""
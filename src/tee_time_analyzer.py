@@ -3,9 +3,17 @@
 Tee Time Analyzer - AI-powered analysis of golf course tee times.
 """
 
+import hashlib
 import logging
-from typing import Optional, List, Dict, Any
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import urljoin, urlparse
 import json
+import httpx
 from openai import OpenAI
 from dotenv import load_dotenv
 import click
@@ -14,23 +22,149 @@ from src.web_processor import get_visible_rendered_html, close_processor
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI()
+# Initialize OpenAI client on a pooled keep-alive connection so that
+# follow-up requests in the same process skip the TLS handshake
+client = OpenAI(
+    http_client=httpx.Client(
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+)
+
+# Model used for tee time analysis
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Maximum number of extra browsers launched to fetch booking pages,
+# shared by every analysis running in the process
+FOLLOW_WORKERS = 3
+
+_follow_browsers = threading.BoundedSemaphore(FOLLOW_WORKERS)
+
+# Maximum number of characters of page content sent to the model
+MAX_CONTENT_LENGTH = 40000
+
+# Directory holding cached model responses, keyed by a hash of the request
+CACHE_DIR = os.path.expanduser(os.environ.get('GOLF_BUDDY_CACHE_DIR', '~/.golf_buddy/gpt_cache'))
+
+# Seconds a cached analysis stays valid; dates are inferred from the page,
+# so an old answer must not outlive the tee sheet it was read from
+CACHE_TTL = 60 * 60
+
+# Keys every analysis must contain
+REQUIRED_KEYS = ["next_available_time", "available_times", "booking_links", "summary"]
+
+# Cheap checks used to skip the model on pages with nothing to extract
+TEE_TIME_PATTERN = re.compile(r'\b(?:1[0-2]|0?[1-9]):[0-5]\d\s*(?:AM|PM)\b', re.IGNORECASE)
+CLOCK_24H_PATTERN = re.compile(r'\b(?:[01]?\d|2[0-3]):[0-5]\d\b')
+BOOKING_PATTERN = re.compile(r'tee\s*times?|book|reserv|schedul', re.IGNORECASE)
+
+# Lines worth sending to the model: times, booking words, prices, dates and
+# the page headers added by combine_pages()
+RELEVANT_LINE_PATTERN = re.compile(
+    '|'.join([
+        TEE_TIME_PATTERN.pattern,
+        CLOCK_24H_PATTERN.pattern,
+        BOOKING_PATTERN.pattern,
+        r'\$\s?\d',
+        r'\b\d{1,2}/\d{1,2}\b',
+        r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b',
+        r'^=== Page: '
+    ]),
+    re.IGNORECASE
+)
+
+# Lines of context kept around each relevant line
+CONTEXT_LINES = 2
+
+# Static instructions sent ahead of the page content on every request
+SYSTEM_PROMPT = """You are a golf tee time analysis expert. Always respond with valid JSON.
+
+Analyze the golf course website content provided by the user and extract tee time information for a maximum of 5 slots.
+The content may span several pages, each starting with a "=== Page: <url> ===" header.
+
+Extract and return a JSON object with the following structure:
+{
+    "next_available_time": "YYYY-MM-DD HH:MM" or null,
+    "available_times": [
+        {
+            "time": "YYYY-MM-DD HH:MM",
+            "players": number,
+            "price": "string",
+            "notes": "string"
+        }
+    ],
+    "booking_links": [
+        {
+            "text": "string",
+            "url": "string"
+        }
+    ],
+    "summary": "string"
+}
+
+IMPORTANT: Your response must be a valid JSON object. Do not include any other text."""
+
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
 
-def fetch_and_extract_tee_times(url: str, follow: bool = True) -> None:
+# The only part of the request that changes between calls
+USER_TEMPLATE = "Content:\n{content}"
+
+# JSON schema enforced on the model's response via structured outputs
+TEE_TIME_SCHEMA = {
+    "name": "tee_time_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "next_available_time": {"type": ["string", "null"]},
+            "available_times": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "time": {"type": "string"},
+                        "players": {"type": "integer"},
+                        "price": {"type": "string"},
+                        "notes": {"type": "string"}
+                    },
+                    "required": ["time", "players", "price", "notes"],
+                    "additionalProperties": False
+                }
+            },
+            "booking_links": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "text": {"type": "string"},
+                        "url": {"type": "string"}
+                    },
+                    "required": ["text", "url"],
+                    "additionalProperties": False
+                }
+            },
+            "summary": {"type": "string"}
+        },
+        "required": ["next_available_time", "available_times", "booking_links", "summary"],
+        "additionalProperties": False
+    }
+}
+
+def fetch_and_extract_tee_times(url: str, follow: bool = True) -> Dict[str, Any]:
     """
     Fetch and analyze tee times from a golf course website.
     
+    The shared browser is left running so that subsequent calls reuse it;
+    callers are responsible for calling close_processor() when done.
+    
     Args:
         url: The URL of the golf course website
         follow: Whether to follow booking links
+        
+    Returns:
+        Dict containing the analysis results, ready for display_results()
     """
     try:
         # Get the initial page content
@@ -38,109 +172,313 @@ def fetch_and_extract_tee_times(url: str, follow: bool = True) -> None:
         if not content:
             raise click.ClickException("Failed to fetch page content")
             
-        # Analyze the content with GPT-4
-        analysis = analyze_tee_times(content)
-        
-        #BUG this needs to be analysed and fixed
-        # Loop here if follow is true and the analysis dict doesnt any of the booking links
-        booking_links = analysis.get("booking_links", None)
-        url = None
-        if follow:
-            for booking_link in booking_links:
-                url = booking_link.get("url", None)
-                logger.info(f"Fetching {url}...")
-                content = get_visible_rendered_html(url)
-                analysis = analyze_tee_times(content)
-                booking_links = analysis.get("booking_links", None)
-                url = None
+        # Analyze the relevant parts of the content with the model
+        analysis = analyze_tee_times(filter_relevant_lines(content))
+        
+        # Fetch every booking page and analyze them together in a single
+        # request instead of paying one model round-trip per link
+        # No need to follow anything if this page already answered the question
+        booking_links = analysis.get("booking_links") or []
+        found = analysis.get("next_available_time") and analysis.get("available_times")
+        if follow and booking_links and not found:
+            pages = fetch_pages(booking_urls(url, booking_links))
+            if pages:
+                followed = analyze_tee_times(combine_pages(pages))
+                # Keep this page's analysis, and its booking links, unless
+                # the booking pages actually turned up tee times
+                if followed.get("next_available_time") or followed.get("available_times"):
+                    analysis = followed
                 
-        # Display the results
-        display_results(analysis)
+        return analysis
         
     except Exception as e:
-        logger.error(f"Error analyzing tee times: {str(e)}")
+        logger.error("Error analyzing tee times: %s", e)
         raise click.ClickException(str(e))
+
+def booking_urls(url: str, booking_links: List[Dict[str, str]]) -> List[str]:
+    """
+    Resolve booking links into the list of pages worth fetching.
+    
+    Relative links are resolved against the page they were found on, only
+    http(s) links are kept (no mailto:, tel: or javascript:), and links to
+    the page itself or to an already listed page are dropped, ignoring
+    trailing slashes.
+    
+    Args:
+        url: The URL of the page the links were found on
+        booking_links: Booking links from the analysis of that page
+        
+    Returns:
+        The absolute URLs to fetch, in their original order
+    """
+    seen = {url.rstrip('/')}
+    link_urls = []
+    for booking_link in booking_links:
+        if not booking_link.get("url"):
+            continue
+        link_url = urljoin(url, booking_link["url"])
+        if urlparse(link_url).scheme not in ('http', 'https'):
+            continue
+        if link_url.rstrip('/') not in seen:
+            seen.add(link_url.rstrip('/'))
+            link_urls.append(link_url)
+    return link_urls
+
+def fetch_pages(urls: List[str]) -> List[Tuple[str, str]]:
+    """
+    Fetch several pages concurrently.
+    
+    The first URL is fetched on the calling thread with its already warm
+    browser. Each remaining URL is fetched on a worker thread with a browser
+    of its own, closed when the fetch completes, as long as fewer than
+    FOLLOW_WORKERS such browsers are running across the whole process;
+    otherwise it is fetched on the calling thread as well.
+    
+    Args:
+        urls: The URLs to fetch
+        
+    Returns:
+        List of (url, content) tuples for the pages that returned content
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=FOLLOW_WORKERS) as executor:
+        futures = {}
+        for link_url in urls[1:]:
+            if not _follow_browsers.acquire(blocking=False):
+                break
+            try:
+                futures[link_url] = executor.submit(_fetch_in_own_browser, link_url)
+            except Exception:
+                _follow_browsers.release()
+                raise
+        contents = {}
+        for link_url in urls:
+            if link_url not in futures:
+                logger.info("Fetching %s...", link_url)
+                contents[link_url] = get_visible_rendered_html(link_url)
+        for link_url, future in futures.items():
+            contents[link_url] = future.result()
+    return [(link_url, contents[link_url]) for link_url in urls if contents[link_url]]
+
+def _fetch_in_own_browser(url: str) -> str:
+    """
+    Fetch a page on a worker thread, closing that thread's browser afterwards
+    and releasing the _follow_browsers slot acquired by the caller.
+    
+    Args:
+        url: The URL to fetch
+        
+    Returns:
+        The page content, or an empty string if it couldn't be fetched
+    """
+    try:
+        logger.info("Fetching %s...", url)
+        return get_visible_rendered_html(url)
+    except Exception as e:
+        logger.error("Error fetching %s: %s", url, e)
+        return ""
     finally:
-        # Clean up
-        close_processor()
+        try:
+            close_processor()
+        finally:
+            _follow_browsers.release()
+
+def combine_pages(pages: List[Tuple[str, str]]) -> str:
+    """
+    Combine the content of several pages into a single body for analysis.
+    
+    Each page is labelled with its URL, reduced to its relevant lines (see
+    filter_relevant_lines) and then truncated to an equal share of
+    MAX_CONTENT_LENGTH so that every page is represented. Filtering first
+    keeps menus and footers from using up a page's share.
+    
+    Args:
+        pages: List of (url, content) tuples
+        
+    Returns:
+        The combined content
+    """
+    budget = MAX_CONTENT_LENGTH // max(len(pages), 1)
+    return "\n\n".join(
+        f"=== Page: {url} ===\n{filter_relevant_lines(content)[:budget]}" for url, content in pages
+    )
+
+def filter_relevant_lines(content: str, context: int = CONTEXT_LINES) -> str:
+    """
+    Keep only the lines that look relevant to tee times, plus some context.
+    
+    Navigation menus and other boilerplate make up most of a typical page;
+    dropping them cuts the number of tokens sent to the model.
+    
+    Args:
+        content: The markdown content to filter
+        context: Number of lines to keep before and after each relevant line
+        
+    Returns:
+        The filtered content, with "..." marking skipped runs of lines
+    """
+    lines = content.splitlines()
+    keep = [False] * len(lines)
+    for i, line in enumerate(lines):
+        if RELEVANT_LINE_PATTERN.search(line):
+            for j in range(max(i - context, 0), min(i + context + 1, len(lines))):
+                keep[j] = True
+    if not any(keep):
+        return ""
+    
+    filtered = []
+    skipped = False
+    for line, kept in zip(lines, keep):
+        if kept:
+            filtered.append(line)
+            skipped = False
+        elif not skipped:
+            filtered.append("...")
+            skipped = True
+    return "\n".join(filtered)
 
 def analyze_tee_times(content: str) -> Dict[str, Any]:
     """
-    Use GPT-4 to analyze tee time information from the content.
+    Use OPENAI_MODEL to analyze tee time information from the content.
+    
+    The content is truncated to MAX_CONTENT_LENGTH characters before it is
+    sent to the model. Content that mentions neither a clock time nor
+    anything booking-related is answered locally without calling the model.
     
     Args:
-        content: The markdown content to analyze
+        content: The markdown content to analyze, already reduced to its
+            relevant lines by filter_relevant_lines() or combine_pages()
         
     Returns:
         Dict containing the analysis results
     """
     try:
-        # Prepare the prompt
-        prompt = f"""
-        Analyze this golf course website content and extract tee time information for a maximum of 5 slots.
-        
-        Content:
-        {content}
-        
-        Extract and return a JSON object with the following structure:
-        {{
-            "next_available_time": "YYYY-MM-DD HH:MM" or null,
-            "available_times": [
-                {{
-                    "time": "YYYY-MM-DD HH:MM",
-                    "players": number,
-                    "price": "string",
-                    "notes": "string"
-                }}
-            ],
-            "booking_links": [
-                {{
-                    "text": "string",
-                    "url": "string"
-                }}
-            ],
-            "summary": "string"
-        }}
-        
-        IMPORTANT: Your response must be a valid JSON object. Do not include any other text.
-        """
-        
-        # Call GPT-4
+        # Bound prompt size regardless of how large the page is
+        if len(content) > MAX_CONTENT_LENGTH:
+            logger.debug("Truncating content from %d to %d characters", len(content), MAX_CONTENT_LENGTH)
+            content = content[:MAX_CONTENT_LENGTH]
+        
+        # Nothing resembling a tee time or a booking link, so skip the model
+        if not any(pattern.search(content) for pattern in (TEE_TIME_PATTERN, CLOCK_24H_PATTERN, BOOKING_PATTERN)):
+            logger.info("No tee time or booking information found, skipping model call")
+            return {
+                "next_available_time": None,
+                "available_times": [],
+                "booking_links": [],
+                "summary": "No tee time or booking information found on the page."
+            }
+        
+        # Static instructions first and the page content last. OpenAI only
+        # caches prompt prefixes of 1024+ tokens, which SYSTEM_PROMPT is well
+        # short of, so this ordering matters only if the prompt grows
+        messages = [
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": USER_TEMPLATE.format(content=content)}
+        ]
+        
+        # Identical requests get identical answers, so reuse a cached one
+        cache_key = hashlib.sha256(f"{OPENAI_MODEL}|{json.dumps(messages)}".encode('utf-8')).hexdigest()
+        cached = _load_cached_analysis(cache_key)
+        if cached is not None:
+            logger.info("Using cached analysis %s", cache_key[:12])
+            return cached
+        
+        # Call the model with the response constrained to TEE_TIME_SCHEMA
         response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "You are a golf tee time analysis expert. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
+            model=OPENAI_MODEL,
+            messages=messages,
+            temperature=0,
             max_tokens=1000,
-            response_format={"type": "json_object"}  # Force JSON response
+            response_format={"type": "json_schema", "json_schema": TEE_TIME_SCHEMA}
         )
         
         # Get the response content
         result = response.choices[0].message.content
-        logger.info(f"Raw GPT response: {result}")
+        logger.debug("Raw GPT response: %s", result)
+        _log_usage(response)
         
         try:
             # Parse the response
             analysis = json.loads(result)
             
             # Validate the response structure
-            required_keys = ["next_available_time", "available_times", "booking_links", "summary"]
-            missing_keys = [key for key in required_keys if key not in analysis]
+            missing_keys = [key for key in REQUIRED_KEYS if key not in analysis]
             if missing_keys:
                 raise ValueError(f"Missing required keys in response: {missing_keys}")
             
+            _store_cached_analysis(cache_key, analysis)
             return analysis
             
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response from GPT: {result}")
+            logger.error("Invalid JSON response from GPT: %s", result)
             raise ValueError(f"Invalid JSON response from GPT: {str(e)}")
         
     except Exception as e:
-        logger.error(f"Error in GPT analysis: {str(e)}")
+        logger.error("Error in GPT analysis: %s", e)
         raise
 
+def _log_usage(response: Any) -> None:
+    """
+    Log the prompt token usage of a model response, including how many
+    prompt tokens were served from OpenAI's prompt cache when reported.
+    
+    Args:
+        response: The chat completion response
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached_tokens = details.get("cached_tokens")
+    else:
+        cached_tokens = getattr(details, "cached_tokens", None)
+    logger.debug("Prompt tokens: %s (cached: %s)", getattr(usage, "prompt_tokens", None), cached_tokens)
+
+def _load_cached_analysis(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a previously cached analysis if it is younger than CACHE_TTL.
+    
+    Args:
+        key: The cache key of the request
+        
+    Returns:
+        The cached analysis, or None if it isn't cached, has expired, can't
+        be read or is missing any of REQUIRED_KEYS
+    """
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) >= CACHE_TTL:
+            return None
+        with open(path, encoding='utf-8') as f:
+            analysis = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(analysis, dict) or any(required not in analysis for required in REQUIRED_KEYS):
+        logger.warning("Ignoring invalid cached analysis %s", key[:12])
+        return None
+    return analysis
+
+def _store_cached_analysis(key: str, analysis: Dict[str, Any]) -> None:
+    """
+    Store an analysis in the cache. Failures are logged and otherwise ignored.
+    
+    Args:
+        key: The cache key of the request
+        analysis: The analysis results to cache
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = os.path.join(CACHE_DIR, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(analysis, f)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not cache analysis: %s", e)
+
 def display_results(analysis: Dict[str, Any]) -> None:
     """
     Display the analysis results in a user-friendly format.
@@ -157,10 +495,10 @@ def display_results(analysis: Dict[str, Any]) -> None:
     # Display all available times
     if analysis.get("available_times"):
         click.echo("\nAvailable tee times:")
-        for time in analysis["available_times"]:
-            click.echo(f"- {time['time']}: {time['players']} players, {time['price']}")
-            if time.get("notes"):
-                click.echo(f"  Note: {time['notes']}")
+        for slot in analysis["available_times"]:
+            click.echo(f"- {slot['time']}: {slot['players']} players, {slot['price']}")
+            if slot.get("notes"):
+                click.echo(f"  Note: {slot['notes']}")
     
     # Display booking links
     if analysis.get("booking_links"):
@@ -177,7 +515,15 @@ def display_results(analysis: Dict[str, Any]) -> None:
 @click.option('--follow/--no-follow', default=True, help='Automatically follow booking links')
 def main(url, follow):
     """Main function to test the tee time extraction."""
-    fetch_and_extract_tee_times(url, follow)
+    try:
+        display_results(fetch_and_extract_tee_times(url, follow))
+    finally:
+        close_processor()
 
 if __name__ == "__main__":
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     main() 
\ No newline at end of file
@@ -3,25 +3,257 @@
 Web Processor - Handles web page fetching and processing.
 """
 
-from playwright.sync_api import sync_playwright, Browser, Page, TimeoutError
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page, Route, TimeoutError
 import logging
 from .html_to_md import html_to_markdown
-from typing import Optional
+from typing import Optional, Dict, Tuple
+import hashlib
+import json
 import time
 import os
+import re
+import threading
+from urllib.parse import urlparse
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Elements that usually indicate tee time or booking content has rendered
+CONTENT_SELECTOR = "table, [class*=tee], [class*=time], [class*=book]"
+
+# Milliseconds to wait for a caller-supplied ready selector
+READY_SELECTOR_TIMEOUT = 15000
+
+# Hides the automation flag from sites that check for headless browsers
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+# Serializes the rendered <body>, falling back to the whole document
+BODY_HTML_SCRIPT = "() => (document.body || document.documentElement).outerHTML"
+
+# Resolves once the DOM has gone 250ms without mutations, or after 2s at most
+DOM_QUIESCE_SCRIPT = """() => new Promise(resolve => {
+    const done = () => { observer.disconnect(); resolve(); };
+    let idle = setTimeout(done, 250);
+    const observer = new MutationObserver(() => {
+        clearTimeout(idle);
+        idle = setTimeout(done, 250);
+    });
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+    setTimeout(done, 2000);
+})"""
+
+# Number of pages served by a browser context before it is replaced
+CONTEXT_RECYCLE_PAGES = 20
+
+# Pages served while Cloudflare verifies the browser
+CLOUDFLARE_CHALLENGE_URL = "https://challenges.cloudflare.com"
+
+def _is_past_challenge(url: str) -> bool:
+    """Return True once the page has left Cloudflare's challenge."""
+    return not url.startswith(CLOUDFLARE_CHALLENGE_URL)
+
+# Resource types that never contribute to the Markdown output
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Scripts and stylesheets are cached on disk across runs, keyed by URL, for
+# their max-age but no longer than STATIC_CACHE_TTL seconds
+STATIC_CACHE_DIR = os.path.expanduser(os.environ.get('GOLF_BUDDY_STATIC_CACHE_DIR', '~/.cache/golf_buddy/static'))
+STATIC_CACHE_TTL = 24 * 60 * 60
+STATIC_CACHE_RESOURCE_TYPES = frozenset({"script", "stylesheet"})
+
+# Upper bound on the size of the static cache; the oldest entries go first
+STATIC_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# The cache is pruned when the first WebProcessor starts and again after
+# this many bytes have been written to it
+STATIC_CACHE_PRUNE_INTERVAL = STATIC_CACHE_MAX_BYTES // 10
+
+# Headers never replayed from the cache: those describing the original
+# transfer rather than the cached body, and cookies
+_UNCACHED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"})
+
+# Cache-Control directives that rule out sharing a response across runs
+_NO_CACHE_DIRECTIVE = re.compile(r'\b(?:no-store|no-cache|private)\b', re.IGNORECASE)
+_MAX_AGE_DIRECTIVE = re.compile(r'\bmax-age\s*=\s*(\d+)', re.IGNORECASE)
+
+# Origin-hosted Cloudflare scripts (challenges, bot management) always go to the network
+CLOUDFLARE_PATH_PREFIX = "/cdn-cgi/"
+
+_static_cache_pruned = False
+_static_bytes_since_prune = 0
+_static_cache_prune_lock = threading.Lock()
+
+def _route_request(route: Route) -> None:
+    """
+    Abort requests for images, media and fonts, serve scripts and stylesheets
+    from the static cache when possible, and let everything else through.
+    """
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+        return
+    if (request.resource_type not in STATIC_CACHE_RESOURCE_TYPES
+            or request.method != "GET"
+            or not _is_past_challenge(request.url)
+            or urlparse(request.url).path.startswith(CLOUDFLARE_PATH_PREFIX)):
+        route.continue_()
+        return
+    
+    path = os.path.join(STATIC_CACHE_DIR, hashlib.sha256(request.url.encode('utf-8')).hexdigest())
+    cached = _load_static(path)
+    if cached is not None:
+        headers, body = cached
+        route.fulfill(status=200, headers=headers, body=body)
+        return
+    
+    try:
+        response = route.fetch()
+    except Exception as e:
+        logger.debug("Static fetch failed for %s: %s", request.url, e)
+        route.continue_()
+        return
+    if response.status == 200 and _is_cacheable(response.headers):
+        _store_static(path, response.headers, response.body())
+    route.fulfill(response=response)
+
+def _is_cacheable(headers: Dict[str, str]) -> bool:
+    """
+    Check whether a response may be stored in the static cache.
+    
+    Responses marked no-store, no-cache or private, or with a zero max-age,
+    are never stored, nor are responses that vary on anything other than
+    the encoding, since the cache is keyed by URL alone.
+    
+    Args:
+        headers: Response headers, with lower-case names
+    """
+    cache_control = headers.get("cache-control", "")
+    if _NO_CACHE_DIRECTIVE.search(cache_control) or _static_ttl(headers) <= 0:
+        return False
+    vary = {value.strip().lower() for value in headers.get("vary", "").split(",") if value.strip()}
+    return vary <= {"accept-encoding"}
+
+def _static_ttl(headers: Dict[str, str]) -> int:
+    """
+    Return how long a static resource may be served from the cache, in seconds.
+    
+    Args:
+        headers: Response headers, with lower-case names
+    """
+    match = _MAX_AGE_DIRECTIVE.search(headers.get("cache-control", ""))
+    if match:
+        return min(int(match.group(1)), STATIC_CACHE_TTL)
+    return STATIC_CACHE_TTL
+
+def _load_static(path: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+    """
+    Load a cached static resource if it is younger than its max-age, capped
+    at STATIC_CACHE_TTL.
+    
+    Each entry is a single file holding a line of JSON headers followed by
+    the body, so headers and body always come from the same response.
+    
+    Args:
+        path: Cache path of the resource
+        
+    Returns:
+        Tuple of (headers, body), or None if not cached or expired
+    """
+    try:
+        with open(path, 'rb') as f:
+            age = time.time() - os.fstat(f.fileno()).st_mtime
+            headers = json.loads(f.readline())
+            if age >= _static_ttl(headers):
+                return None
+            return headers, f.read()
+    except (OSError, ValueError):
+        return None
+
+def _store_static(path: str, headers: Dict[str, str], body: bytes) -> None:
+    """
+    Store a static resource in the cache. Failures are logged and ignored.
+    
+    Args:
+        path: Cache path of the resource
+        headers: Response headers of the resource
+        body: Decoded response body
+    """
+    try:
+        os.makedirs(STATIC_CACHE_DIR, exist_ok=True)
+        headers = {name: value for name, value in headers.items() if name.lower() not in _UNCACHED_HEADERS}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(headers).encode('utf-8') + b"\n")
+            f.write(body)
+        # Atomic rename so concurrent readers never see a partial entry
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not cache static resource: %s", e)
+        return
+    _maybe_prune_static_cache(len(body))
+
+def _maybe_prune_static_cache(written: int = 0) -> None:
+    """
+    Prune the static cache if it hasn't been pruned by this process yet, or
+    if STATIC_CACHE_PRUNE_INTERVAL bytes have been written since it was.
+    
+    Args:
+        written: Number of bytes just written to the cache
+    """
+    global _static_cache_pruned, _static_bytes_since_prune
+    with _static_cache_prune_lock:
+        _static_bytes_since_prune += written
+        if _static_cache_pruned and _static_bytes_since_prune < STATIC_CACHE_PRUNE_INTERVAL:
+            return
+        _static_cache_pruned = True
+        _static_bytes_since_prune = 0
+    _prune_static_cache()
+
+def _prune_static_cache() -> None:
+    """
+    Delete static cache files older than STATIC_CACHE_TTL, then the oldest
+    remaining entries until the cache fits in STATIC_CACHE_MAX_BYTES.
+    Failures are logged and otherwise ignored.
+    """
+    try:
+        now = time.time()
+        entries = []
+        with os.scandir(STATIC_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                    if now - stat.st_mtime >= STATIC_CACHE_TTL:
+                        os.remove(entry.path)
+                    elif not entry.name.endswith(".tmp"):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    pass
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= STATIC_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(entry_path)
+                total -= size
+            except OSError:
+                pass
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not prune static cache: %s", e)
+
 class WebProcessor:
     def __init__(self, headless: bool = None):
         """
         Initialize the WebProcessor with a Playwright browser instance.
         
+        If GOLF_BUDDY_CDP_ENDPOINT is set, connects to the browser listening
+        there instead of launching a new one; closing the processor then
+        only disconnects from it.
+        
         Args:
             headless: Whether to run the browser in headless mode.
                      If None, uses GOLF_BUDDY_HEADLESS env var or defaults to False.
@@ -30,32 +262,56 @@ class WebProcessor:
             headless = os.environ.get('GOLF_BUDDY_HEADLESS', 'false').lower() == 'true'
             
         self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=headless,  # Use configured headless mode
-            args=[
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-gpu',
-                '--disable-software-rasterizer',
-                '--disable-extensions',
-                '--disable-blink-features=AutomationControlled'  # Hide automation
-            ]
-        )
-        self.context = self.browser.new_context(
+        self.browser = None
+        
+        # Attach to an already running browser when one is configured, so
+        # separate CLI invocations can share it instead of each launching one
+        cdp_endpoint = os.environ.get('GOLF_BUDDY_CDP_ENDPOINT')
+        if cdp_endpoint:
+            try:
+                self.browser = self.playwright.chromium.connect_over_cdp(cdp_endpoint)
+                logger.debug("Connected to browser at %s", cdp_endpoint)
+            except Exception as e:
+                logger.warning("Could not connect to browser at %s, launching one: %s", cdp_endpoint, e)
+        
+        if self.browser is None:
+            self.browser = self.playwright.chromium.launch(
+                headless=headless,  # Use configured headless mode
+                args=[
+                    '--disable-dev-shm-usage',
+                    '--no-sandbox',
+                    '--disable-setuid-sandbox',
+                    '--disable-gpu',
+                    '--disable-software-rasterizer',
+                    '--disable-extensions',
+                    '--disable-blink-features=AutomationControlled'  # Hide automation
+                ]
+            )
+        self.context = self._new_context()
+        self._pages_since_recycle = 0
+        _maybe_prune_static_cache()
+        logger.debug("WebProcessor initialized with browser instance (headless=%s)", headless)
+
+    def _new_context(self) -> BrowserContext:
+        """
+        Create a browser context with the processor's standard settings.
+        
+        Returns:
+            BrowserContext: The new context
+        """
+        context = self.browser.new_context(
             viewport={"width": 1920, "height": 1080},
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
             java_script_enabled=True,
             bypass_csp=True,  # Bypass Content Security Policy
             ignore_https_errors=True  # Ignore HTTPS errors
         )
+        # Skip resources that can't affect the Markdown and serve scripts
+        # and stylesheets from the static cache
+        context.route("**/*", _route_request)
         # Add stealth scripts
-        self.context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-        logger.debug(f"WebProcessor initialized with browser instance (headless={headless})")
+        context.add_init_script(STEALTH_SCRIPT)
+        return context
 
     def wait_for_cloudflare(self, page: Page, timeout: int = 30) -> bool:
         """
@@ -69,87 +325,100 @@ class WebProcessor:
             bool: True if verification passed, False otherwise
         """
         try:
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                # Check if we're still on the challenge page
-                if page.url.startswith("https://challenges.cloudflare.com"):
-                    time.sleep(2)
-                    continue
-                
-                # Check if we've been redirected to the target page
-                if not page.url.startswith("https://challenges.cloudflare.com"):
-                    return True
-                
-                time.sleep(1)
+            # Resolves as soon as the browser leaves the challenge page,
+            # or immediately if it isn't on one
+            page.wait_for_url(_is_past_challenge, timeout=timeout * 1000)
+            return True
             
+        except TimeoutError:
             logger.error("Cloudflare verification timeout")
             return False
             
         except Exception as e:
-            logger.error(f"Error during Cloudflare verification: {str(e)}")
+            logger.error("Error during Cloudflare verification: %s", e)
             return False
 
-    def wait_for_page_load(self, page: Page, timeout: int = 30) -> bool:
+    def wait_for_page_load(self, page: Page, timeout: int = 30, ready_selector: Optional[str] = None) -> bool:
         """
         Wait for the page to load completely, including any redirects.
         
         Args:
             page (Page): The Playwright page object
             timeout (int): Maximum time to wait in seconds
+            ready_selector (Optional[str]): CSS selector that marks the page as
+                ready, used instead of the generic tee time content selector
             
         Returns:
             bool: True if page loaded successfully, False otherwise
         """
         try:
-            start_time = time.time()
+            # Wait until we're past any challenge page and its DOM is ready
+            page.wait_for_url(_is_past_challenge, timeout=timeout * 1000, wait_until='domcontentloaded')
             
-            while time.time() - start_time < timeout:
+            # Then wait for content that looks like tee times rather than for
+            # the network to go idle
+            if ready_selector:
                 try:
-                    # Wait for network to be idle with a longer timeout
-                    page.wait_for_load_state('networkidle', timeout=10000)
-                    
-                    # Check if we're on a valid page
-                    if page.url and not page.url.startswith("https://challenges.cloudflare.com"):
-                        # Wait for any Turnstile iframe to be handled
-                        if page.url.startswith("https://cityofsunnyvale.ezlinksgolf.com"):
-                            time.sleep(5)  # Give time for Turnstile to complete
-                        
-                        return True
-                    
-                    time.sleep(1)
+                    page.wait_for_selector(ready_selector, state='attached', timeout=READY_SELECTOR_TIMEOUT)
                 except TimeoutError:
-                    # If networkidle times out, check if we're on a valid page
-                    if page.url and not page.url.startswith("https://challenges.cloudflare.com"):
-                        return True
-                    continue
+                    logger.warning("Ready selector %s not found on %s", ready_selector, page.url)
+            else:
+                try:
+                    page.wait_for_selector(CONTENT_SELECTOR, state='attached', timeout=5000)
+                except TimeoutError:
+                    logger.debug("No tee time content selector found on %s", page.url)
+            
+            # Let late scripts finish rendering; returns as soon as the DOM
+            # has been quiet for a moment. This only helps the page settle,
+            # so a late navigation destroying the context isn't a failure
+            try:
+                page.evaluate(DOM_QUIESCE_SCRIPT)
+            except Exception as e:
+                logger.debug("DOM quiescence wait interrupted on %s: %s", page.url, e)
+            
+            # Wait for any Turnstile iframe to be handled
+            if page.url.startswith("https://cityofsunnyvale.ezlinksgolf.com"):
+                page.wait_for_timeout(5000)  # Give time for Turnstile to complete
+            
+            return True
             
+        except TimeoutError:
             logger.error("Page load timeout")
             return False
             
         except Exception as e:
-            logger.error(f"Error waiting for page load: {str(e)}")
+            logger.error("Error waiting for page load: %s", e)
             return False
 
-    def get_visible_rendered_html(self, url: str) -> str:
+    def get_visible_rendered_html(self, url: str, ready_selector: Optional[str] = None) -> str:
         """
         Use the initialized browser to fetch fully rendered HTML of a web page,
         then convert it to clean Markdown.
         
         Args:
             url (str): The URL to fetch and process
+            ready_selector (Optional[str]): CSS selector to wait for before
+                reading the page
             
         Returns:
             str: The converted Markdown content
         """
         try:
+            # Playwright only frees per-page protocol objects when their
+            # context closes, so start a fresh one every few pages
+            if self._pages_since_recycle >= CONTEXT_RECYCLE_PAGES:
+                self.context.close()
+                self.context = self._new_context()
+                self._pages_since_recycle = 0
+            self._pages_since_recycle += 1
+            
             # Create new page
             page = self.context.new_page()
             page.set_default_timeout(30000)  # 30 second timeout
             
             try:
                 # Navigate and wait for network idle
-                logger.info(f"Fetching content from: {url}")
+                logger.info("Fetching content from: %s", url)
                 
                 # First attempt to load the page
                 response = page.goto(url, wait_until='domcontentloaded')
@@ -173,15 +442,13 @@ class WebProcessor:
                         return ""
                 
                 # Wait for the page to load completely
-                if not self.wait_for_page_load(page):
+                if not self.wait_for_page_load(page, ready_selector=ready_selector):
                     logger.error("Failed to load page completely")
                     return ""
                 
-                # Wait for any dynamic content
-                page.wait_for_timeout(2000)
-                
-                # Get the rendered HTML
-                html = page.content()
+                # Get the rendered HTML of the body only; html2text discards
+                # everything in <head>, so there's no point transferring it
+                html = page.evaluate(BODY_HTML_SCRIPT)
                 
                 # Convert HTML to Markdown
                 markdown = html_to_markdown(html)
@@ -192,7 +459,7 @@ class WebProcessor:
                 page.close()
                 
         except Exception as e:
-            logger.error(f"Error processing URL: {str(e)}")
+            logger.error("Error processing URL: %s", e)
             return ""
 
     def close(self):
@@ -205,39 +472,72 @@ class WebProcessor:
             if hasattr(self, 'playwright'):
                 self.playwright.stop()
         except Exception as e:
-            logger.error(f"Error closing WebProcessor: {str(e)}")
+            logger.error("Error closing WebProcessor: %s", e)
+
+# Per-thread instances: the sync Playwright API may only be used from the
+# thread that started it, so every worker thread gets its own processor
+_local = threading.local()
 
-# Global instance
-_processor = None
+# Recently rendered pages shared by all threads:
+# (url, ready_selector) -> (fetch time, markdown)
+PAGE_CACHE_TTL = 60
+PAGE_CACHE_SIZE = 128
+_page_cache: Dict[Tuple[str, Optional[str]], Tuple[float, str]] = {}
+_page_cache_lock = threading.Lock()
 
 def get_processor(headless: bool = None) -> WebProcessor:
     """
-    Get or create the global WebProcessor instance.
+    Get or create the WebProcessor instance for the current thread.
     
     Args:
         headless: Whether to run the browser in headless mode.
                  If None, uses GOLF_BUDDY_HEADLESS env var or defaults to True.
     """
-    global _processor
-    if _processor is None:
-        _processor = WebProcessor(headless=headless)
-    return _processor
+    processor = getattr(_local, 'processor', None)
+    if processor is None:
+        processor = WebProcessor(headless=headless)
+        _local.processor = processor
+    return processor
 
-def get_visible_rendered_html(url: str, headless: bool = None) -> str:
+def get_visible_rendered_html(url: str, headless: bool = None, force: bool = False,
+                              ready_selector: Optional[str] = None) -> str:
     """
     Get the visible rendered HTML of a web page.
     
+    Pages fetched within the last PAGE_CACHE_TTL seconds with the same
+    ready_selector are returned from an in-memory cache instead of being
+    rendered again.
+    
     Args:
         url: The URL to fetch and process
         headless: Whether to run the browser in headless mode.
                  If None, uses GOLF_BUDDY_HEADLESS env var or defaults to True.
+        force: Whether to bypass the cache and always fetch a fresh copy
+        ready_selector: CSS selector to wait for before reading the page
     """
+    cache_key = (url, ready_selector)
+    if not force:
+        with _page_cache_lock:
+            cached = _page_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < PAGE_CACHE_TTL:
+                logger.info("Using cached content for: %s", url)
+                return cached[1]
+    
     processor = get_processor(headless=headless)
-    return processor.get_visible_rendered_html(url)
+    markdown = processor.get_visible_rendered_html(url, ready_selector=ready_selector)
+    
+    # Only cache successful fetches so failures are retried
+    if markdown:
+        with _page_cache_lock:
+            _page_cache[cache_key] = (time.monotonic(), markdown)
+            if len(_page_cache) > PAGE_CACHE_SIZE:
+                # Evict the oldest entry
+                del _page_cache[min(_page_cache, key=lambda key: _page_cache[key][0])]
+    return markdown
 
 def close_processor():
-    """Close the global WebProcessor instance."""
-    global _processor
-    if _processor is not None:
-        _processor.close()
-        _processor = None
+    """Close the WebProcessor instance owned by the current thread."""
+    processor = getattr(_local, 'processor', None)
+    if processor is not None:
+        processor.close()
+        _local.processor = None
@@ -3,6 +3,7 @@
 Test suite for the Golf Buddy CLI.
 """
 
+import logging
 import os
 import pytest
 from click.testing import CliRunner
@@ -36,6 +37,17 @@ def test_cli_help(runner):
     assert "analyze-tee-times" in result.output
     assert "convert-to-markdown" in result.output
 
+@patch('src.tee_time_analyzer.fetch_and_extract_tee_times', return_value=None)
+def test_verbose_enables_debug_logging(mock_fetch, runner):
+    """Test that --verbose turns on debug logging for the application."""
+    logger = logging.getLogger('src')
+    try:
+        result = runner.invoke(cli, ['--verbose', 'analyze-tee-times', 'https://example.com'])
+        assert result.exit_code == 0
+        assert logger.level == logging.DEBUG
+    finally:
+        logger.setLevel(logging.NOTSET)
+
 def test_analyze_tee_times_help(runner):
     """Test that the analyze-tee-times help message is displayed correctly."""
     result = runner.invoke(cli, ['analyze-tee-times', '--help'])
@@ -58,6 +70,7 @@ def test_analyze_tee_times_success(mock_fetch, runner):
     mock_fetch.return_value = None
     result = runner.invoke(cli, ['analyze-tee-times', 'https://example.com'])
     assert result.exit_code == 0
+    assert "Analyzing tee times from https://example.com" in result.output
     mock_fetch.assert_called_once_with('https://example.com', True)
 
 @patch('src.tee_time_analyzer.fetch_and_extract_tee_times')
@@ -66,6 +79,7 @@ def test_analyze_tee_times_no_follow(mock_fetch, runner):
     mock_fetch.return_value = None
     result = runner.invoke(cli, ['analyze-tee-times', '--no-follow', 'https://example.com'])
     assert result.exit_code == 0
+    assert "Analyzing tee times from https://example.com" in result.output
     mock_fetch.assert_called_once_with('https://example.com', False)
 
 def test_analyze_tee_times_no_urls(runner):
@@ -81,7 +95,7 @@ def test_convert_to_markdown_success(mock_get_html, runner):
     result = runner.invoke(cli, ['convert-to-markdown', 'https://example.com'])
     assert result.exit_code == 0
     assert "# Test Content" in result.output
-    mock_get_html.assert_called_once_with('https://example.com')
+    mock_get_html.assert_called_once_with('https://example.com', ready_selector=None)
 
 @patch('src.web_processor.get_visible_rendered_html')
 def test_convert_to_markdown_with_output(mock_get_html, runner, tmp_path):
@@ -91,10 +105,12 @@ def test_convert_to_markdown_with_output(mock_get_html, runner, tmp_path):
     result = runner.invoke(cli, ['convert-to-markdown', 'https://example.com', '-o', str(output_file)])
     assert result.exit_code == 0
     assert output_file.read_text() == "# Test Content"
-    mock_get_html.assert_called_once_with('https://example.com')
+    mock_get_html.assert_called_once_with('https://example.com', ready_selector=None)
 
-def test_convert_to_markdown_invalid_url(runner):
+@patch('src.web_processor.get_visible_rendered_html')
+def test_convert_to_markdown_invalid_url(mock_get_html, runner):
     """Test that an error is shown for invalid URLs."""
+    mock_get_html.return_value = ""
     result = runner.invoke(cli, ['convert-to-markdown', 'not-a-url'])
     assert result.exit_code != 0
     assert "Error processing URL" in result.output
@@ -105,26 +121,17 @@ def test_convert_to_markdown_no_url(runner):
     assert result.exit_code != 0
     assert "Missing argument 'URL'" in result.output
 
-def test_analyze_tee_times_single_url(runner):
-    """Test analyze-tee-times command with a single URL."""
-    result = runner.invoke(cli, ['analyze-tee-times', TEST_URLS[0]])
-    assert result.exit_code == 0
-    assert f"Analyzing tee times from {TEST_URLS[0]}" in result.output
-
-def test_analyze_tee_times_multiple_urls(runner):
+@patch('src.tee_time_analyzer.fetch_and_extract_tee_times', return_value=None)
+def test_analyze_tee_times_multiple_urls(mock_fetch, runner):
     """Test analyze-tee-times command with multiple URLs."""
     result = runner.invoke(cli, ['analyze-tee-times', *TEST_URLS])
     assert result.exit_code == 0
     for url in TEST_URLS:
         assert f"Analyzing tee times from {url}" in result.output
+    assert mock_fetch.call_count == len(TEST_URLS)
 
-def test_analyze_tee_times_follow_option(runner):
-    """Test analyze-tee-times command with --no-follow option."""
-    result = runner.invoke(cli, ['analyze-tee-times', '--no-follow', TEST_URLS[0]])
-    assert result.exit_code == 0
-    assert f"Analyzing tee times from {TEST_URLS[0]}" in result.output
-
-def test_convert_to_markdown_file(runner, tmp_path):
+@patch('src.web_processor.get_visible_rendered_html', return_value="# Test Content")
+def test_convert_to_markdown_file(mock_get_html, runner, tmp_path):
     """Test convert-to-markdown command with file output."""
     output_file = tmp_path / "output.md"
     result = runner.invoke(cli, ['convert-to-markdown', TEST_URLS[0], '-o', str(output_file)])
@@ -132,8 +139,36 @@ def test_convert_to_markdown_file(runner, tmp_path):
     assert output_file.exists()
     assert output_file.read_text().strip()  # Should have some content
 
-def test_convert_to_markdown_invalid_output_path(runner):
+@patch('src.web_processor.get_visible_rendered_html', return_value="# Test Content")
+def test_convert_to_markdown_invalid_output_path(mock_get_html, runner):
     """Test convert-to-markdown command with an invalid output path."""
     result = runner.invoke(cli, ['convert-to-markdown', TEST_URLS[0], '-o', '/invalid/path/output.md'])
     assert result.exit_code != 0
-    assert "Error" in result.output 
\ No newline at end of file
+    assert "Error" in result.output
+
+@patch('src.tee_time_analyzer.fetch_and_extract_tee_times')
+def test_analyze_tee_times_reports_each_url(mock_fetch, runner):
+    """Test that every URL's results are displayed when analyzed concurrently."""
+    mock_fetch.side_effect = lambda url, follow: {"summary": f"Summary for {url}"}
+    result = runner.invoke(cli, ['analyze-tee-times', *TEST_URLS])
+    assert result.exit_code == 0
+    assert mock_fetch.call_count == len(TEST_URLS)
+    for url in TEST_URLS:
+        assert f"Results for {url}:" in result.output
+        assert f"Summary: Summary for {url}" in result.output
+
+@patch('src.web_processor.get_visible_rendered_html')
+def test_convert_to_markdown_ready_selector(mock_get_html, runner):
+    """Test that --ready-selector is passed through to the fetch."""
+    mock_get_html.return_value = "# Test Content"
+    result = runner.invoke(cli, ['convert-to-markdown', '--ready-selector', '.tee-time-row', 'https://example.com'])
+    assert result.exit_code == 0
+    mock_get_html.assert_called_once_with('https://example.com', ready_selector='.tee-time-row')
+
+@pytest.mark.network
+def test_convert_to_markdown_live(runner, tmp_path):
+    """Test convert-to-markdown against a real page with a real browser."""
+    output_file = tmp_path / "output.md"
+    result = runner.invoke(cli, ['convert-to-markdown', TEST_URLS[0], '-o', str(output_file)])
+    assert result.exit_code == 0
+    assert output_file.read_text().strip()
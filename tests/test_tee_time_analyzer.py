@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test suite for the tee time analyzer.
+"""
+
+import json
+import os
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from src.tee_time_analyzer import analyze_tee_times, booking_urls, combine_pages, fetch_and_extract_tee_times, fetch_pages, filter_relevant_lines, CACHE_TTL, MAX_CONTENT_LENGTH
+
+EMPTY_ANALYSIS = {
+    "next_available_time": None,
+    "available_times": [],
+    "booking_links": [],
+    "summary": ""
+}
+
+def make_analysis(**kwargs):
+    """Build an analysis dict with the required keys."""
+    return {**EMPTY_ANALYSIS, **kwargs}
+
+def test_combine_pages_labels_each_page():
+    """Test that every page is labelled with its URL."""
+    combined = combine_pages([("https://a.com", "Book at 7:30 AM"), ("https://b.com", "Book at 8:00 AM")])
+    assert "=== Page: https://a.com ===\nBook at 7:30 AM" in combined
+    assert "=== Page: https://b.com ===\nBook at 8:00 AM" in combined
+
+def test_combine_pages_splits_budget():
+    """Test that long pages share MAX_CONTENT_LENGTH equally."""
+    line = "| 7:30 AM | 4 players | $45 |"
+    page = "\n".join([line] * (MAX_CONTENT_LENGTH // len(line)))
+    combined = combine_pages([("https://a.com", page), ("https://b.com", page)])
+    sections = combined.split("=== Page: ")[1:]
+    assert len(sections) == 2
+    for section in sections:
+        body = section.split("===\n", 1)[1].strip()
+        assert len(body) <= MAX_CONTENT_LENGTH // 2
+        assert line in body
+
+def test_combine_pages_keeps_tee_times_after_boilerplate():
+    """Test that tee times at the end of long booking pages survive the budget."""
+    boilerplate = "\n".join(f"Menu link {i} about our clubhouse" for i in range(700))
+    pages = [(f"https://book{i}.com", f"{boilerplate}\n| 7:30 AM | 4 | $45 |") for i in range(3)]
+    assert all(len(content) > 20000 for _, content in pages)
+    combined = combine_pages(pages)
+    assert combined.count("| 7:30 AM | 4 | $45 |") == 3
+    assert "7:30 AM" in filter_relevant_lines(combined)
+
+@patch('src.tee_time_analyzer.analyze_tee_times')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_follow_analyzes_booking_pages_in_one_call(mock_get_html, mock_analyze):
+    """Test that all booking pages are analyzed with a single model call."""
+    mock_get_html.side_effect = lambda url: f"content of {url}"
+    mock_analyze.side_effect = [
+        make_analysis(booking_links=[
+            {"text": "Book", "url": "https://book1.com"},
+            {"text": "Reserve", "url": "https://book2.com"}
+        ]),
+        make_analysis(next_available_time="2024-05-01 07:30", summary="done")
+    ]
+    analysis = fetch_and_extract_tee_times("https://example.com", follow=True)
+    assert mock_analyze.call_count == 2
+    combined = mock_analyze.call_args_list[1].args[0]
+    assert "content of https://book1.com" in combined
+    assert "content of https://book2.com" in combined
+    assert analysis == make_analysis(next_available_time="2024-05-01 07:30", summary="done")
+
+@patch('src.tee_time_analyzer.analyze_tee_times')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_follow_keeps_landing_analysis_when_nothing_found(mock_get_html, mock_analyze):
+    """Test that the landing page's booking links survive a fruitless follow-up."""
+    mock_get_html.side_effect = lambda url: f"content of {url}"
+    landing = make_analysis(booking_links=[{"text": "Book", "url": "https://book1.com"}], summary="landing")
+    mock_analyze.side_effect = [landing, make_analysis(summary="nothing here")]
+    analysis = fetch_and_extract_tee_times("https://example.com", follow=True)
+    assert mock_analyze.call_count == 2
+    assert analysis == landing
+
+@patch('src.tee_time_analyzer.analyze_tee_times')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_no_follow_skips_booking_pages(mock_get_html, mock_analyze):
+    """Test that booking links are not fetched with follow disabled."""
+    mock_get_html.return_value = "content"
+    mock_analyze.return_value = make_analysis(booking_links=[{"text": "Book", "url": "https://book1.com"}])
+    fetch_and_extract_tee_times("https://example.com", follow=False)
+    mock_get_html.assert_called_once_with("https://example.com")
+    assert mock_analyze.call_count == 1
+
+@patch('src.tee_time_analyzer.client')
+def test_analyze_skips_model_without_tee_time_content(mock_client):
+    """Test that pages without times or booking words never reach the model."""
+    analysis = analyze_tee_times("# About Us\n\nFamily owned since 1962.")
+    mock_client.chat.completions.create.assert_not_called()
+    assert analysis["next_available_time"] is None
+    assert analysis["available_times"] == []
+    assert analysis["booking_links"] == []
+
+@patch('src.tee_time_analyzer.client')
+def test_analyze_reuses_cached_response(mock_client, tmp_path, monkeypatch):
+    """Test that an identical request is answered from the cache."""
+    monkeypatch.setattr('src.tee_time_analyzer.CACHE_DIR', str(tmp_path))
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps(make_analysis(summary="cached"))
+    mock_client.chat.completions.create.return_value = response
+    first = analyze_tee_times("Book a tee time: 7:30 AM")
+    second = analyze_tee_times("Book a tee time: 7:30 AM")
+    assert first == second == make_analysis(summary="cached")
+    mock_client.chat.completions.create.assert_called_once()
+
+def test_filter_relevant_lines_keeps_context():
+    """Test that relevant lines are kept with surrounding context."""
+    lines = [f"Menu item {i}" for i in range(10)] + ["| 7:30 AM | 4 players | $45 |"] + [f"Footer {i}" for i in range(10)]
+    filtered = filter_relevant_lines("\n".join(lines), context=1).splitlines()
+    assert filtered == ["...", "Menu item 9", "| 7:30 AM | 4 players | $45 |", "Footer 0", "..."]
+
+@patch('src.tee_time_analyzer.analyze_tee_times')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_follow_dedupes_and_resolves_links(mock_get_html, mock_analyze):
+    """Test that relative and duplicate booking links are fetched once."""
+    mock_get_html.side_effect = lambda url: f"content of {url}"
+    mock_analyze.side_effect = [
+        make_analysis(booking_links=[
+            {"text": "Book", "url": "/book"},
+            {"text": "Book now", "url": "https://example.com/book"},
+            {"text": "Home", "url": "https://example.com"}
+        ]),
+        make_analysis()
+    ]
+    fetch_and_extract_tee_times("https://example.com", follow=True)
+    assert [call.args[0] for call in mock_get_html.call_args_list] == [
+        "https://example.com",
+        "https://example.com/book"
+    ]
+
+@patch('src.tee_time_analyzer.analyze_tee_times')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_follow_skipped_when_tee_times_found(mock_get_html, mock_analyze):
+    """Test that booking links aren't followed once tee times are found."""
+    mock_get_html.return_value = "content"
+    mock_analyze.return_value = make_analysis(
+        next_available_time="2024-05-01 07:30",
+        available_times=[{"time": "2024-05-01 07:30", "players": 4, "price": "$45", "notes": ""}],
+        booking_links=[{"text": "Book", "url": "https://book1.com"}]
+    )
+    fetch_and_extract_tee_times("https://example.com", follow=True)
+    mock_get_html.assert_called_once_with("https://example.com")
+    assert mock_analyze.call_count == 1
+
+@patch('src.tee_time_analyzer.client')
+def test_analyze_ignores_expired_cache(mock_client, tmp_path, monkeypatch):
+    """Test that cached responses older than CACHE_TTL are not reused."""
+    monkeypatch.setattr('src.tee_time_analyzer.CACHE_DIR', str(tmp_path))
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps(make_analysis(summary="fresh"))
+    mock_client.chat.completions.create.return_value = response
+    analyze_tee_times("Book a tee time: 7:30 AM")
+    old = time.time() - CACHE_TTL - 1
+    for path in tmp_path.iterdir():
+        os.utime(path, (old, old))
+    analyze_tee_times("Book a tee time: 7:30 AM")
+    assert mock_client.chat.completions.create.call_count == 2
+
+def test_booking_urls_skips_non_http_and_trailing_slash_duplicates():
+    """Test that only new http(s) pages are followed."""
+    links = [
+        {"text": "Email", "url": "mailto:pro@example.com"},
+        {"text": "Call", "url": "tel:+15555550100"},
+        {"text": "Menu", "url": "javascript:void(0)"},
+        {"text": "Home", "url": "https://example.com/"},
+        {"text": "Book", "url": "/book/"},
+        {"text": "Book now", "url": "https://example.com/book"}
+    ]
+    assert booking_urls("https://example.com", links) == ["https://example.com/book/"]
+
+@patch('src.tee_time_analyzer.close_processor')
+@patch('src.tee_time_analyzer.get_visible_rendered_html')
+def test_fetch_pages_reuses_caller_browser_when_limit_reached(mock_get_html, mock_close, monkeypatch):
+    """Test that no extra browsers are launched once the process-wide limit is reached."""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr('src.tee_time_analyzer._follow_browsers', slots)
+    mock_get_html.side_effect = lambda url: f"content of {url}"
+    pages = fetch_pages(["https://book1.com", "https://book2.com", "https://book3.com"])
+    assert pages == [(url, f"content of {url}") for url in ["https://book1.com", "https://book2.com", "https://book3.com"]]
+    mock_close.assert_not_called()
+
+@patch('src.tee_time_analyzer.client')
+def test_24_hour_tee_sheet_reaches_model(mock_client, tmp_path, monkeypatch):
+    """Test that 24-hour times without booking words are kept and analyzed."""
+    monkeypatch.setattr('src.tee_time_analyzer.CACHE_DIR', str(tmp_path))
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps(make_analysis())
+    mock_client.chat.completions.create.return_value = response
+    sheet = "\n".join([f"Menu item {i}" for i in range(10)] + ["| 07:30 | 4 |", "| 14:10 | 2 |"])
+    content = filter_relevant_lines(sheet)
+    assert "| 07:30 | 4 |" in content and "| 14:10 | 2 |" in content
+    analyze_tee_times(content)
+    mock_client.chat.completions.create.assert_called_once()
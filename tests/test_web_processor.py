@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test suite for the web processor.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from src import web_processor
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    """Start every test with an empty page cache."""
+    web_processor._page_cache.clear()
+    yield
+    web_processor._page_cache.clear()
+
+@pytest.fixture
+def mock_processor():
+    """Replace the per-thread WebProcessor with a mock."""
+    processor = MagicMock()
+    processor.get_visible_rendered_html.return_value = "# Tee Times"
+    with patch('src.web_processor.get_processor', return_value=processor):
+        yield processor
+
+def test_repeat_fetch_uses_cache(mock_processor):
+    """Test that fetching the same URL twice only renders it once."""
+    assert web_processor.get_visible_rendered_html("https://example.com") == "# Tee Times"
+    assert web_processor.get_visible_rendered_html("https://example.com") == "# Tee Times"
+    mock_processor.get_visible_rendered_html.assert_called_once_with("https://example.com", ready_selector=None)
+
+def test_force_bypasses_cache(mock_processor):
+    """Test that force=True always renders the page again."""
+    web_processor.get_visible_rendered_html("https://example.com")
+    web_processor.get_visible_rendered_html("https://example.com", force=True)
+    assert mock_processor.get_visible_rendered_html.call_count == 2
+
+def test_failed_fetch_not_cached(mock_processor):
+    """Test that empty results are retried rather than cached."""
+    mock_processor.get_visible_rendered_html.return_value = ""
+    web_processor.get_visible_rendered_html("https://example.com")
+    web_processor.get_visible_rendered_html("https://example.com")
+    assert mock_processor.get_visible_rendered_html.call_count == 2
+
+def make_route(resource_type, url="https://example.com/app.js"):
+    """Build a mock Playwright route for a GET request."""
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.method = "GET"
+    route.request.url = url
+    return route
+
+def test_route_blocks_images():
+    """Test that image requests are aborted."""
+    route = make_route("image", "https://example.com/logo.png")
+    web_processor._route_request(route)
+    route.abort.assert_called_once()
+    route.continue_.assert_not_called()
+
+def test_route_serves_scripts_from_static_cache(tmp_path, monkeypatch):
+    """Test that a fetched script is served from disk the second time."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    first = make_route("script")
+    first.fetch.return_value.status = 200
+    first.fetch.return_value.headers = {"content-type": "application/javascript", "content-encoding": "gzip"}
+    first.fetch.return_value.body.return_value = b"console.log(1)"
+    web_processor._route_request(first)
+    first.fulfill.assert_called_once_with(response=first.fetch.return_value)
+    
+    second = make_route("script")
+    web_processor._route_request(second)
+    second.fetch.assert_not_called()
+    second.fulfill.assert_called_once_with(
+        status=200,
+        headers={"content-type": "application/javascript"},
+        body=b"console.log(1)"
+    )
+
+@patch('src.web_processor.sync_playwright')
+def test_connects_to_configured_browser(mock_sync_playwright, monkeypatch):
+    """Test that GOLF_BUDDY_CDP_ENDPOINT attaches instead of launching."""
+    monkeypatch.setattr('src.web_processor._static_cache_pruned', True)
+    monkeypatch.setenv('GOLF_BUDDY_CDP_ENDPOINT', 'http://localhost:9222')
+    chromium = mock_sync_playwright.return_value.start.return_value.chromium
+    web_processor.WebProcessor(headless=True)
+    chromium.connect_over_cdp.assert_called_once_with('http://localhost:9222')
+    chromium.launch.assert_not_called()
+
+def test_page_load_survives_interrupted_quiesce_wait():
+    """Test that a navigation during the DOM quiescence wait doesn't fail the load."""
+    processor = web_processor.WebProcessor.__new__(web_processor.WebProcessor)
+    page = MagicMock()
+    page.url = "https://example.com"
+    page.evaluate.side_effect = Exception("Execution context was destroyed")
+    assert processor.wait_for_page_load(page)
+
+def test_static_cache_skips_uncacheable_responses(tmp_path, monkeypatch):
+    """Test that no-store and private responses are never cached."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    for cache_control in ("no-store", "private, max-age=600"):
+        route = make_route("script")
+        route.fetch.return_value.status = 200
+        route.fetch.return_value.headers = {"cache-control": cache_control}
+        web_processor._route_request(route)
+        route.fulfill.assert_called_once_with(response=route.fetch.return_value)
+    assert list(tmp_path.iterdir()) == []
+
+def test_static_cache_drops_cookies(tmp_path, monkeypatch):
+    """Test that cookies set by a cached resource are not replayed."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    first = make_route("script")
+    first.fetch.return_value.status = 200
+    first.fetch.return_value.headers = {"content-type": "application/javascript", "set-cookie": "__cf_bm=abc"}
+    first.fetch.return_value.body.return_value = b"console.log(1)"
+    web_processor._route_request(first)
+    
+    second = make_route("script")
+    web_processor._route_request(second)
+    assert second.fulfill.call_args.kwargs["headers"] == {"content-type": "application/javascript"}
+
+def test_route_bypasses_cache_for_cloudflare_scripts(tmp_path, monkeypatch):
+    """Test that origin-hosted /cdn-cgi/ scripts always go to the network."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    route = make_route("script", "https://example.com/cdn-cgi/challenge-platform/main.js")
+    web_processor._route_request(route)
+    route.continue_.assert_called_once()
+    route.fetch.assert_not_called()
+
+def test_prune_static_cache_removes_expired_files(tmp_path, monkeypatch):
+    """Test that expired static cache files are deleted."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    expired = tmp_path / "expired.body"
+    fresh = tmp_path / "fresh.body"
+    expired.write_bytes(b"old")
+    fresh.write_bytes(b"new")
+    old = web_processor.time.time() - web_processor.STATIC_CACHE_TTL - 1
+    web_processor.os.utime(expired, (old, old))
+    web_processor._prune_static_cache()
+    assert not expired.exists()
+    assert fresh.exists()
+
+def test_ready_selector_not_served_from_plain_fetch(mock_processor):
+    """Test that a fetch waiting for a selector doesn't reuse a fetch that didn't."""
+    web_processor.get_visible_rendered_html("https://example.com")
+    web_processor.get_visible_rendered_html("https://example.com", ready_selector=".tee-time-row")
+    assert mock_processor.get_visible_rendered_html.call_count == 2
+    mock_processor.get_visible_rendered_html.assert_called_with("https://example.com", ready_selector=".tee-time-row")
+
+def test_prune_static_cache_enforces_size_limit(tmp_path, monkeypatch):
+    """Test that the oldest entries are evicted once the cache is over its size limit."""
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr('src.web_processor.STATIC_CACHE_MAX_BYTES', 10)
+    now = web_processor.time.time()
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        entry = tmp_path / name
+        entry.write_bytes(b"12345")
+        web_processor.os.utime(entry, (now - age, now - age))
+    web_processor._prune_static_cache()
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["middle", "newest"]